@@ -1,15 +1,16 @@
+import argparse
 import json
+import os
+import sys
+import time
 from typing import List, Optional, Tuple
 
-import pandas as pd
-import numpy as np
-from scipy.special import softmax
-
 from utils.time import TimestampAgg
-from utils.ts import TSTransform, CompoundTransform
 from utils.logger import setupLogging
-from utils.dataloader import HuaweiDataset
-from model.similarity import DTW, Aggregator
+from utils.checkpoint import DSWCheckpoint
+
+# pandas, numpy, scipy and the modules built on them are imported where they
+# are used, so that the command line starts fast for light subcommands
 
 
 class AID:
@@ -18,6 +19,7 @@ class AID:
         loggerName = "AID"
         self._logger = setupLogging('logs', loggerName)
         # initialize data loader
+        from utils.dataloader import HuaweiDataset
         self._loader = HuaweiDataset()
 
     def _filterCandidate(self, candidateList):
@@ -50,8 +52,9 @@ class AID:
                               rowIdx,
                               transformOperations,
                               mpw: int,
-                              metricAggFunc=Aggregator.mean_agg,
-                              kpiNorm: str = "minmax"):
+                              metricAggFunc=None,
+                              kpiNorm: str = "minmax",
+                              checkpoint: Optional[DSWCheckpoint] = None):
         """Calculate the intensity of dependency
         Args:
             filteredCand: a list of filtered candidates, see self.eval()
@@ -60,18 +63,32 @@ class AID:
             rowIdx: the time index (bin index), see self.eval()
             transformOperations: the normalization of time series, see self.eval()
             mpw: max propagation window, check the DSW algorithm for details
-            metricAggFunc: how to aggregate the metrics in each bin, default is mean aggregation
+            metricAggFunc: how to aggregate the metrics in each bin, None for mean aggregation
             kpiNorm: normalize the distances of the same kpi, can be "minmax" or "softmax"
+            checkpoint: if given, distances found in it are reused and newly
+                computed ones are appended to it
 
         Returns:
             candidateList: a list of filtered calls
         """
+        import pandas as pd
+        from utils.ts import CompoundTransform
+        from model.similarity import DTW
+
         def transform(TSDict, cmdbId, kpi, rowIdx):
             srs = pd.Series(TSDict.loc[cmdbId][kpi], index=rowIdx).fillna(0)
             return CompoundTransform(srs, transformOperations)
 
+        reused = 0
         for item in filteredCand:
+            added = False
             for kpi in kpiList:
+                if checkpoint is not None:
+                    distance = checkpoint.get(item['c'], item['p'], kpi)
+                    if distance is not None:
+                        item[f'dsw-{kpi}'] = distance
+                        reused += 1
+                        continue
                 # TODO
                 # if the input array is constant (usually because we cannot detect any error)
                 # then we should mark it as UNKNOWN
@@ -79,7 +96,41 @@ class AID:
                     transform(TSDict, item['c'], kpi, rowIdx),
                     transform(TSDict, item['p'], kpi, rowIdx),
                     mpw=mpw)
+                if checkpoint is not None:
+                    checkpoint.add(item['c'], item['p'], kpi, item[f'dsw-{kpi}'])
+                    added = True
+            if added:
+                checkpoint.flush()
+        if checkpoint is not None:
+            checkpoint.markComplete(len(filteredCand), kpiList)
+            self._logger.info(
+                f"Reused {reused} of {len(filteredCand) * len(kpiList)} distances from checkpoint")
+
+        return self._calculateIntensity(filteredCand, kpiList,
+                                        metricAggFunc=metricAggFunc,
+                                        kpiNorm=kpiNorm)
+
+    def _calculateIntensity(self,
+                            filteredCand,
+                            kpiList,
+                            metricAggFunc=None,
+                            kpiNorm: str = "minmax"):
+        """Normalize raw dsw distances and aggregate them into intensity
+        Args:
+            filteredCand: a list of candidates with dsw-{kpi} distances
+            kpiList: name of kpis to use
+            metricAggFunc: see self._calculateKPIDistance()
+            kpiNorm: see self._calculateKPIDistance()
 
+        Returns:
+            candidateList: candidates sorted by intensity
+        """
+        import numpy as np
+        from scipy.special import softmax
+        from model.similarity import Aggregator
+
+        if metricAggFunc is None:
+            metricAggFunc = Aggregator.mean_agg
         if kpiNorm == "softmax":
             for kpi in kpiList:
                 allValues = np.array(
@@ -111,33 +162,105 @@ class AID:
         filteredCand.sort(key=lambda x: x[f'intensity'], reverse=True)
         return filteredCand
 
+    def _load(self, path: str, interval: int, workers: int = 0):
+        """Load a csv file, or the output of self.preprocess()
+
+        Returns:
+            (candidateList, TSDict, cmdbList, kpiList), see HuaweiDataset.load()
+            source: name and hash of the csv a preprocessed file was made
+                from, None when path is the csv itself
+        """
+        import pandas as pd
+
+        self._logger.info(f"File name: {path}")
+        source = None
+        if path.endswith(".pkl"):
+            data = pd.read_pickle(path)
+            if data["interval"] != int(interval):
+                raise ValueError(
+                    f"{path} is aggregated by {data['interval']} minute(s), not {interval}")
+            result = data["candidateList"], data["TSDict"], data["cmdbList"], data["kpiList"]
+            source = data.get("source")
+        elif workers > 0:
+            result = self._loader.loadPipelined(
+                path,
+                tsAggFunc=TimestampAgg.toFreqMinute,
+                tsAggFreq=int(interval),
+                workers=workers)
+            for line in self._loader.pipelineStats.lines():
+                self._logger.info(f"Loader {line}")
+        else:
+            result = self._loader.load(
+                path,
+                tsAggFunc=TimestampAgg.toFreqMinute,
+                tsAggFreq=int(interval))
+        self._logger.info(f"Finish loading dataset")
+        return result, source
+
+    def preprocess(self,
+                   path: str,
+                   outPath: str,
+                   interval: int = 1,
+                   workers: int = 0):
+        """Load and aggregate a csv file once, and save it for later runs
+
+        Args:
+            path: csv file name
+            outPath: pickle file to write, can be passed to self.eval() as path
+            interval: see self.eval()
+            workers: see self.eval()
+        """
+        import pandas as pd
+
+        (candidateList, TSDict, cmdbList, kpiList), source = self._load(path, interval, workers)
+        if source is None:
+            # lets checkpoints of runs on the pickle and on the csv match
+            source = {"path": os.path.basename(path),
+                      "fileHash": DSWCheckpoint.fileHash(path)}
+        pd.to_pickle({"interval": int(interval),
+                      "source": source,
+                      "candidateList": candidateList,
+                      "TSDict": TSDict,
+                      "cmdbList": cmdbList,
+                      "kpiList": kpiList}, outPath)
+        self._logger.info(f"Saved preprocessed data to {outPath}")
+
     def eval(self,
              path: str,
              start: str,
              end: str,
              interval: int = 1,
              transformOperations: List[Tuple] = [('ZN',), ("MA", 15)],
-             mpw: int = 5):
+             mpw: int = 5,
+             workers: int = 0,
+             metricAggFunc=None,
+             kpiNorm: str = "minmax",
+             checkpointDir: Optional[str] = None):
         """interface for evaluating dependency intensity
 
         Args:
-            path: csv file name
+            path: csv file name, or a pickle written by self.preprocess()
             start: start date or time, eight-digit date YYYYMMDD
             end: end date or time, eight-digit date YYYYMMDD
             interval: aggregation interval. 1 minute is recommeneded.
             transformOperations
+            workers: parse the file in a pipeline with this many parser
+                threads, 0 means reading it at once with pd.read_csv
+            metricAggFunc: how to aggregate the normalized distances of all kpis,
+                None for mean aggregation
+            kpiNorm: normalization of distances, "minmax" or "softmax"
+            checkpointDir: if given, raw dsw distances are saved there while
+                computing, and a rerun with the same configuration only
+                computes the missing ones
 
         Returns:
             intensity: a list of dicts, sorted by intensity value, higher
                 value indicates higher dependency intensity
         """
+        import pandas as pd
+
         # 1. load file
-        self._logger.info(f"File name: {path}")
-        candidateList, TSDict, cmdbList, kpiList = self._loader.load(
-            path,
-            tsAggFunc=TimestampAgg.toFreqMinute,
-            tsAggFreq=int(interval))
-        self._logger.info(f"Finish loading dataset")
+        (candidateList, TSDict, cmdbList, kpiList), source = self._load(path, interval, workers)
 
         # 2. preprocess
         # filter candidate
@@ -161,28 +284,381 @@ class AID:
         self._logger.info("Calculate inensity")
         self._logger.info(f"Applied Transformations: {transformOperations}")
         self._logger.info(f"DSW Max Propagation Window: {mpw}")
-        intensityList = self._calculateKPIDistance(candidateList, TSDict, kpiList, rowIdx,
-                                                   transformOperations=transformOperations,
-                                                   mpw=mpw,
-                                                   metricAggFunc=Aggregator.mean_agg)
+        checkpoint = None
+        if checkpointDir:
+            checkpoint = DSWCheckpoint(checkpointDir, DSWCheckpoint.runConfig(
+                path, interval, rowIdx, transformOperations, mpw, source=source))
+            self._logger.info(f"Checkpoint: {checkpoint.path}")
+        try:
+            intensityList = self._calculateKPIDistance(candidateList, TSDict, kpiList, rowIdx,
+                                                       transformOperations=transformOperations,
+                                                       mpw=mpw,
+                                                       metricAggFunc=metricAggFunc,
+                                                       kpiNorm=kpiNorm,
+                                                       checkpoint=checkpoint)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
         self._logger.info("Finish calculating intensity")
 
+        return self._simplify(intensityList)
+
+    @staticmethod
+    def _simplify(intensityList):
         # remove unnecessary attributes
-        intensityList = list(map(
+        return list(map(
             lambda x: {"c": x["c"],
                        "p": x["p"],
                        "intensity": x["intensity"]},
             intensityList)
         )
 
-        return intensityList
+    def renormalize(self,
+                    checkpointPath: str,
+                    metricAggFunc=None,
+                    kpiNorm: str = "minmax"):
+        """Recalculate intensity from the raw distances of a finished checkpoint
 
+        No data is loaded and no dsw is computed, so trying another
+        normalization or aggregation is cheap.
 
-if __name__ == "__main__":
-    # uasge example
+        Args:
+            checkpointPath: checkpoint file written by self.eval()
+            metricAggFunc: see self.eval()
+            kpiNorm: see self.eval()
+
+        Returns:
+            intensity: same as self.eval()
+        """
+        config, distances, complete = DSWCheckpoint.read(checkpointPath)
+        if complete is None:
+            raise ValueError(
+                f"{checkpointPath} is from an unfinished run, finish it with eval() first")
+        candidateList, kpiList = DSWCheckpoint.candidates(distances)
+        self._logger.info(f"Checkpoint config: {config}")
+        self._logger.info(
+            f"Loaded {len(candidateList)} candidates and {len(kpiList)} kpis from checkpoint")
+        incomplete = [item for item in candidateList
+                      if any(f'dsw-{kpi}' not in item for kpi in complete["kpiList"])]
+        if (len(candidateList) != complete["candidates"]
+                or set(kpiList) != set(complete["kpiList"]) or incomplete):
+            raise ValueError(
+                f"{checkpointPath} should have {complete['candidates']} candidates with "
+                f"{len(complete['kpiList'])} kpis each, but has {len(candidateList)} candidates "
+                f"of which {len(incomplete)} miss distances")
+        kpiList = complete["kpiList"]
+        intensityList = self._calculateIntensity(candidateList, kpiList,
+                                                 metricAggFunc=metricAggFunc,
+                                                 kpiNorm=kpiNorm)
+        return self._simplify(intensityList)
+
+
+def _nonNegativeInt(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"{text} is negative")
+    return value
+
+
+def _positiveInt(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"{text} is not positive")
+    return value
+
+
+def parseTransforms(text: str) -> List[Tuple]:
+    """Parse transformations like "ZN,MA:15" into [('ZN',), ('MA', 15)]"""
+    transformOperations = []
+    for op in filter(None, text.split(",")):
+        name, *params = op.split(":")
+        transformOperations.append(
+            (name, *map(lambda x: int(x) if x.lstrip('-').isdigit() else float(x), params)))
+    return transformOperations
+
+
+def _metricAggFunc(name: str):
+    from model.similarity import Aggregator
+    return getattr(Aggregator, f"{name}_agg")
+
+
+def _dumpJSON(obj, path: str):
+    with open(path, 'w') as f:
+        json.dump(obj, f, indent=4)
+
+
+class _RunMeter:
+    """Measure runtime and memory of a run for the score subcommand
+
+    Peak memory is the high-water mark of the whole process, so every run
+    has to get a process of its own, see _cmdSweep().
+    """
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.cpuStart = time.process_time()
+        return self
+
+    def __exit__(self, *args):
+        import resource
+
+        self.runtime = time.perf_counter() - self.start
+        self.cpuTime = time.process_time() - self.cpuStart
+        # ru_maxrss is in KB on Linux
+        self.peakMemoryMB = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def dump(self, config, outputPath: str):
+        from model.evaluation import metaPath
+
+        _dumpJSON({"config": config,
+                   "runtime": self.runtime,
+                   "cpuTime": self.cpuTime,
+                   "peakMemoryMB": self.peakMemoryMB}, metaPath(outputPath))
+
+
+def _runConfig(args, **override):
+    config = {"path": args.path, "start": args.start, "end": args.end or args.start,
+              "interval": args.interval, "mpw": args.mpw, "transforms": args.transforms,
+              "kpiNorm": args.kpi_norm, "agg": args.agg, "workers": args.workers}
+    config.update(override)
+    return config
+
+
+def _cmdPreprocess(args):
+    AID().preprocess(args.path, args.output,
+                     interval=args.interval, workers=args.workers)
+
+
+def _cmdEval(args):
     aid = AID()
-    intensity = aid.eval("data/industry/status_1min_20210411.csv.xz",
-                         start="20210411",
-                         end='20210411')
-    with open("intensity.json", 'w') as f:
-        json.dump(intensity, f, indent=4)
+    with _RunMeter() as meter:
+        if args.from_checkpoint:
+            intensity = aid.renormalize(args.from_checkpoint,
+                                        metricAggFunc=_metricAggFunc(args.agg),
+                                        kpiNorm=args.kpi_norm)
+        else:
+            intensity = aid.eval(args.path,
+                                 start=args.start,
+                                 end=args.end or args.start,
+                                 interval=args.interval,
+                                 transformOperations=args.transforms,
+                                 mpw=args.mpw,
+                                 workers=args.workers,
+                                 metricAggFunc=_metricAggFunc(args.agg),
+                                 kpiNorm=args.kpi_norm,
+                                 checkpointDir=args.checkpoint_dir)
+    _dumpJSON(intensity, args.output)
+    if args.from_checkpoint:
+        config = {"fromCheckpoint": args.from_checkpoint,
+                  "kpiNorm": args.kpi_norm, "agg": args.agg}
+    else:
+        config = _runConfig(args)
+    meter.dump(config, args.output)
+
+
+def _sweepRun(args, interval, mpw, transforms):
+    aid = AID()
+    name = f"intensity-i{interval}-mpw{mpw}-{transforms.replace(':', '').replace(',', '_')}.json"
+    with _RunMeter() as meter:
+        intensity = aid.eval(args.path,
+                             start=args.start,
+                             end=args.end or args.start,
+                             interval=interval,
+                             transformOperations=parseTransforms(transforms),
+                             mpw=mpw,
+                             workers=args.workers,
+                             metricAggFunc=_metricAggFunc(args.agg),
+                             kpiNorm=args.kpi_norm,
+                             checkpointDir=args.checkpoint_dir)
+    output = os.path.join(args.output_dir, name)
+    _dumpJSON(intensity, output)
+    meter.dump(_runConfig(args, interval=interval, mpw=mpw,
+                          transforms=parseTransforms(transforms)), output)
+
+
+def _cmdSweep(args):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+    # a fresh spawned process per configuration, so that its peak memory is
+    # not inherited from earlier ones and the pareto front is independent of
+    # the order of the runs
+    context = multiprocessing.get_context("spawn")
+    for interval in args.interval:
+        for mpw in args.mpw:
+            for transforms in args.transforms:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    pool.submit(_sweepRun, args, interval, mpw, transforms).result()
+
+
+def _cmdQuery(args):
+    with open(args.input) as f:
+        intensity = json.load(f)
+    result = [x for x in intensity
+              if (args.child is None or x['c'] == args.child)
+              and (args.parent is None or x['p'] == args.parent)
+              and x['intensity'] >= args.min_intensity]
+    if args.top:
+        result = result[:args.top]
+    if args.json:
+        json.dump(result, sys.stdout, indent=4)
+        print()
+    else:
+        for x in result:
+            print(f"{x['intensity']:.6f}\t{x['c']}\t{x['p']}")
+
+
+def _cmdScore(args):
+    from model.evaluation import Evaluator
+
+    evaluator = Evaluator(args.labels, k=args.k, threshold=args.threshold, eps=args.eps)
+    # skip the sidecars, so that a glob like sweep/*.json can be passed
+    rows = evaluator.score([x for x in args.outputs if not x.endswith(".meta.json")])
+    print(Evaluator.formatTable(rows))
+    if args.output:
+        Evaluator.saveTable(rows, args.output)
+
+
+def _cmdBench(args):
+    from utils.dataloader import HuaweiDataset
+
+    loader = HuaweiDataset()
+    if not args.skip_serial:
+        start = time.perf_counter()
+        loader.load(args.path, tsAggFunc=TimestampAgg.toFreqMinute,
+                    tsAggFreq=args.interval)
+        print(f"serial load: {time.perf_counter() - start:.2f}s")
+    for workers in args.workers:
+        loader.loadPipelined(args.path, tsAggFunc=TimestampAgg.toFreqMinute,
+                             tsAggFreq=args.interval, workers=workers,
+                             blockSize=int(args.block_size * 2**20))
+        print(f"pipelined load, {workers} workers:")
+        for line in loader.pipelineStats.lines():
+            print(f"    {line}")
+
+
+_EVAL_DEFAULTS = {"interval": 1, "workers": 0, "mpw": 5,
+                  "transforms": [('ZN',), ("MA", 15)]}
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(
+        description="AID: predict the aggregated intensity of dependency between services")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # eval leaves its defaults to main(), to tell which options were given
+    def addData(p, multi=False, optionalPath=False, defaults=True):
+        p.add_argument("path", nargs="?" if optionalPath else None,
+                       help="trace csv file (.csv or .csv.xz), or a preprocessed .pkl")
+        p.add_argument("--interval", type=int, default=([1] if multi else 1) if defaults else None,
+                       nargs="+" if multi else None,
+                       help="aggregation interval in minutes (default: 1)")
+        p.add_argument("--workers", type=_nonNegativeInt, default=0 if defaults else None,
+                       help="parser threads of the pipelined loader, 0 reads the file at once (default: 0)")
+
+    def addEval(p, multi=False, defaults=True):
+        p.add_argument("--start", required=multi, help="start date, YYYYMMDD")
+        p.add_argument("--end", help="end date, YYYYMMDD (default: same as start)")
+        p.add_argument("--mpw", type=int, default=([5] if multi else 5) if defaults else None,
+                       nargs="+" if multi else None,
+                       help="max propagation window of DSW (default: 5)")
+        if multi:
+            p.add_argument("--transforms", default=["ZN,MA:15"], nargs="+",
+                           help="time series transformations, e.g. ZN,MA:15 (default: ZN,MA:15)")
+        else:
+            p.add_argument("--transforms", type=parseTransforms,
+                           default="ZN,MA:15" if defaults else None,
+                           help="time series transformations, e.g. ZN,MA:15 (default: ZN,MA:15)")
+        p.add_argument("--kpi-norm", choices=["minmax", "softmax"], default="minmax",
+                       help="normalization of distances of the same kpi (default: minmax)")
+        p.add_argument("--agg", choices=["mean", "max", "min"], default="mean",
+                       help="aggregation of the distances of all kpis (default: mean)")
+        p.add_argument("--checkpoint-dir",
+                       help="save raw DSW distances here and resume from them")
+
+    p = subparsers.add_parser("preprocess", help="load and aggregate a trace file once into a .pkl")
+    addData(p)
+    p.add_argument("-o", "--output", required=True, help="output .pkl file")
+    p.set_defaults(func=_cmdPreprocess)
+
+    p = subparsers.add_parser("eval", help="calculate the intensity of dependency")
+    addData(p, optionalPath=True, defaults=False)
+    addEval(p, defaults=False)
+    p.add_argument("--from-checkpoint",
+                   help="only renormalize the distances of a finished checkpoint file")
+    p.add_argument("-o", "--output", default="intensity.json",
+                   help="output json file (default: intensity.json)")
+    p.set_defaults(func=_cmdEval)
+
+    p = subparsers.add_parser("sweep", help="evaluate every combination of the given parameters")
+    addData(p, multi=True)
+    addEval(p, multi=True)
+    p.add_argument("-o", "--output-dir", default="sweep",
+                   help="directory of the output json files (default: sweep)")
+    p.set_defaults(func=_cmdSweep)
+
+    p = subparsers.add_parser("query", help="look up edges in an intensity json file")
+    p.add_argument("input", nargs="?", default="intensity.json",
+                   help="output of eval (default: intensity.json)")
+    p.add_argument("-c", "--child", help="only edges with this child service")
+    p.add_argument("-p", "--parent", help="only edges with this parent service")
+    p.add_argument("--min-intensity", type=float, default=float("-inf"),
+                   help="only edges with at least this intensity")
+    p.add_argument("-k", "--top", type=int, help="only the k edges with the highest intensity")
+    p.add_argument("--json", action="store_true", help="print json instead of a table")
+    p.set_defaults(func=_cmdQuery)
+
+    p = subparsers.add_parser("score", help="compare intensity outputs against labelled edges")
+    p.add_argument("outputs", nargs="+", help="intensity json files written by eval or sweep")
+    p.add_argument("-l", "--labels", required=True,
+                   help="ground truth, json or csv with c, p and label (or intensity)")
+    p.add_argument("-k", type=int, default=10, help="cut-off of precision@k and ndcg@k (default: 10)")
+    p.add_argument("--threshold", type=float, default=0.5,
+                   help="labels at or above count as relevant for precision@k (default: 0.5)")
+    p.add_argument("--eps", type=float, default=1e-15,
+                   help="clipping of predictions in cross entropy (default: 1e-15)")
+    p.add_argument("-o", "--output", help="also save the table as csv")
+    p.set_defaults(func=_cmdScore)
+
+    p = subparsers.add_parser("bench", help="measure the loading throughput")
+    p.add_argument("path", help="trace csv file (.csv or .csv.xz)")
+    p.add_argument("--interval", type=int, default=1,
+                   help="aggregation interval in minutes (default: 1)")
+    p.add_argument("--workers", type=_positiveInt, default=[4], nargs="+",
+                   help="parser threads of the pipelined loader to try (default: 4)")
+    p.add_argument("--block-size", type=float, default=8,
+                   help="decompressed MB per parsed block (default: 8)")
+    p.add_argument("--skip-serial", action="store_true",
+                   help="do not measure the serial pd.read_csv load")
+    p.set_defaults(func=_cmdBench)
+
+    return parser
+
+
+def main(argv=None):
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if args.command == "eval":
+        runOptions = {"path": args.path, "--start": args.start, "--end": args.end,
+                      "--interval": args.interval, "--workers": args.workers,
+                      "--mpw": args.mpw, "--transforms": args.transforms,
+                      "--checkpoint-dir": args.checkpoint_dir}
+        if args.from_checkpoint:
+            given = [name for name, value in runOptions.items() if value is not None]
+            if given:
+                parser.error(f"--from-checkpoint uses the run config stored in the checkpoint, "
+                             f"it cannot be combined with {', '.join(given)}")
+        elif not (args.path and args.start):
+            parser.error("eval needs a path and --start, or --from-checkpoint")
+        for name, value in _EVAL_DEFAULTS.items():
+            if getattr(args, name) is None:
+                setattr(args, name, value)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    # usage example:
+    #   python intensity.py eval data/industry/status_1min_20210411.csv.xz --start 20210411
+    main()
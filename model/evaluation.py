@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .metric import (cross_entropy, mean_absolute_error, root_mean_squared_error,
+                     precision_at_k, ndcg_at_k)
+
+
+def metaPath(outputPath: str):
+    """Path of the sidecar file with run config, runtime and memory of an output"""
+    return f"{os.path.splitext(outputPath)[0]}.meta.json"
+
+
+def loadLabels(path: str):
+    """Load ground-truth dependency labels
+
+    Args:
+        path: json list of {"c", "p", "label"} dicts, or a csv with the
+            columns c, p, label. An intensity json written by AID can be used
+            as well, its "intensity" is taken as label, e.g. to compare
+            approximate runs against an exact one.
+
+    Returns:
+        edges: list of (child, parent)
+        labels: numpy array of labels in [0, 1]
+    """
+    if path.endswith(".csv"):
+        with open(path, newline='') as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(path) as f:
+            records = json.load(f)
+    edges, labels = [], []
+    for record in records:
+        edges.append((record["c"], record["p"]))
+        labels.append(float(record["label"] if "label" in record else record["intensity"]))
+    return edges, np.array(labels)
+
+
+def loadIntensity(path: str) -> Dict:
+    """Load an intensity json as a dict of (child, parent) -> intensity"""
+    with open(path) as f:
+        return {(x["c"], x["p"]): x["intensity"] for x in json.load(f)}
+
+
+def loadMeta(path: str) -> Dict:
+    """Load the sidecar of an intensity json, empty if it was not recorded"""
+    if not os.path.isfile(metaPath(path)):
+        return {}
+    with open(metaPath(path)) as f:
+        return json.load(f)
+
+
+class Evaluator:
+    """Score many intensity outputs against the same labels at once
+
+    Predictions of all outputs are stacked into one (outputs x edges) matrix,
+    so every metric is computed for all outputs in a single vectorized call.
+    Only the labelled edges are scored, an edge missing from an output (e.g.
+    cut by top-k or screening) counts as intensity 0.
+    """
+
+    def __init__(self,
+                 labelPath: str,
+                 k: int = 10,
+                 threshold: float = 0.5,
+                 eps: float = 1e-15):
+        self.edges, self.labels = loadLabels(labelPath)
+        self.k = k
+        self.threshold = threshold
+        self.eps = eps
+
+    def predictionMatrix(self, intensityDicts: List[Dict]):
+        """
+        Returns:
+            pred: (outputs x edges) array of intensity
+            coverage: fraction of labelled edges found in each output
+        """
+        column = {edge: j for j, edge in enumerate(self.edges)}
+        pred = np.full((len(intensityDicts), len(self.edges)), np.nan)
+        for i, intensity in enumerate(intensityDicts):
+            # one aligned scatter per output, edges without label are dropped
+            cols = np.fromiter((column.get(edge, -1) for edge in intensity),
+                               dtype=int, count=len(intensity))
+            values = np.fromiter(intensity.values(), dtype=float, count=len(intensity))
+            pred[i, cols[cols >= 0]] = values[cols >= 0]
+        found = ~np.isnan(pred)
+        return np.where(found, pred, 0.0), found.mean(axis=-1)
+
+    def score(self, outputPaths: List[str]):
+        """Accuracy, runtime and memory of every output
+
+        Returns:
+            rows: one dict per output, with a "pareto" flag marking the
+                outputs that no other output beats in ndcg, runtime and
+                memory at the same time. Only outputs that cover every
+                labelled edge take part: one that drops edges (top-k,
+                screening) is never on the front, however fast it is.
+        """
+        pred, coverage = self.predictionMatrix(
+            [loadIntensity(path) for path in outputPaths])
+        metrics = {
+            "mae": mean_absolute_error(self.labels, pred),
+            "rmse": root_mean_squared_error(self.labels, pred),
+            "cross_entropy": cross_entropy(self.labels, pred, eps=self.eps),
+            f"precision@{self.k}": precision_at_k(self.labels, pred, self.k,
+                                                  threshold=self.threshold),
+            f"ndcg@{self.k}": ndcg_at_k(self.labels, pred, self.k),
+        }
+
+        rows = []
+        for i, path in enumerate(outputPaths):
+            meta = loadMeta(path)
+            row = {"output": os.path.splitext(os.path.basename(path))[0],
+                   "coverage": float(coverage[i])}
+            row.update({name: float(values[i]) for name, values in metrics.items()})
+            row["runtime"] = meta.get("runtime")
+            row["peakMemoryMB"] = meta.get("peakMemoryMB")
+            row["config"] = json.dumps(meta.get("config", {}), sort_keys=True)
+            rows.append(row)
+
+        accuracy = f"ndcg@{self.k}"
+        complete = [row for row in rows if row["coverage"] == 1.0]
+        for row in rows:
+            row["pareto"] = row["coverage"] == 1.0 and not any(
+                self._dominates(other, row, accuracy)
+                for other in complete if other is not row)
+        rows.sort(key=lambda x: x[accuracy], reverse=True)
+        return rows
+
+    @staticmethod
+    def _dominates(a, b, accuracy):
+        # higher accuracy, lower runtime and memory are better, unknown cost counts as worst
+        def cost(row, key):
+            return float("inf") if row[key] is None else row[key]
+
+        better = [a[accuracy] - b[accuracy],
+                  cost(b, "runtime") - cost(a, "runtime"),
+                  cost(b, "peakMemoryMB") - cost(a, "peakMemoryMB")]
+        better = [0.0 if np.isnan(x) else x for x in better]
+        return all(x >= 0 for x in better) and any(x > 0 for x in better)
+
+    @staticmethod
+    def formatTable(rows: List[Dict], columns: Optional[List[str]] = None):
+        """Render rows as an aligned text table"""
+        if not rows:
+            return ""
+        columns = columns or [key for key in rows[0] if key != "config"]
+
+        def fmt(value):
+            if value is None:
+                return "-"
+            if isinstance(value, float):
+                return f"{value:.4f}"
+            return str(value)
+
+        cells = [columns] + [[fmt(row[col]) for col in columns] for row in rows]
+        widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+        return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+                         for line in cells)
+
+    @staticmethod
+    def saveTable(rows: List[Dict], path: str):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
@@ -1,37 +1,72 @@
-import math
 import numpy as np
 
+# All metrics accept a batch of predictions: label has shape (n,) and pred
+# has shape (n,) or (m, n) for m configurations, the result then has shape (m,)
 
-def cross_entropy(label, pred):
+
+def cross_entropy(label, pred, eps=1e-15):
     """
     Two lists:  label, pred
-    Returns the float corresponding to their cross-entropy
+    Returns the float corresponding to their cross-entropy,
+    pred is clipped to [eps, 1-eps] to avoid log(0)
     """
-    assert len(label) == len(
-        pred), "label and pred should have the same length"
-    sum = 0.0
-    for x in map(lambda y, p: (1-y)*math.log(1-p)+y*math.log(p), label, pred):
-        sum += x
-    return -sum/len(label)
+    label, pred = np.asarray(label, dtype=float), np.asarray(pred, dtype=float)
+    assert label.shape[-1] == pred.shape[-1], \
+        "label and pred should have the same length"
+    pred = np.clip(pred, eps, 1 - eps)
+    return -((1-label)*np.log(1-pred) + label*np.log(pred)).mean(axis=-1)
 
 
 def mean_absolute_error(label, pred):
-    label, pred = np.array(label), np.array(pred)
+    label, pred = np.asarray(label, dtype=float), np.asarray(pred, dtype=float)
     diff = pred - label
     abs_diff = np.absolute(diff)
-    mean_diff = abs_diff.mean()
+    mean_diff = abs_diff.mean(axis=-1)
     return mean_diff
 
 
 def root_mean_squared_error(label, pred):
-    label, pred = np.array(label), np.array(pred)
+    label, pred = np.asarray(label, dtype=float), np.asarray(pred, dtype=float)
     diff = pred - label
     differences_squared = diff ** 2
-    mean_diff = differences_squared.mean()
+    mean_diff = differences_squared.mean(axis=-1)
     rmse_val = np.sqrt(mean_diff)
     return rmse_val
 
 
+def _top_k(label, pred, k):
+    # indices of the k highest predictions, ties are broken pessimistically
+    # (lowest label first), so constant or missing predictions rank no better
+    # than the worst order instead of inheriting the order of the label file
+    label = np.broadcast_to(label, pred.shape)
+    return np.lexsort((label, -pred), axis=-1)[..., :k]
+
+
+def precision_at_k(label, pred, k, threshold=0.5):
+    """
+    Fraction of relevant edges (label >= threshold) among the k edges
+    with the highest pred
+    """
+    label, pred = np.asarray(label, dtype=float), np.asarray(pred, dtype=float)
+    k = min(k, label.shape[-1])
+    relevant = np.broadcast_to(label >= threshold, pred.shape)
+    return np.take_along_axis(relevant, _top_k(label, pred, k), axis=-1).mean(axis=-1)
+
+
+def ndcg_at_k(label, pred, k):
+    """
+    Normalized discounted cumulative gain of the k edges with the highest
+    pred, using label as graded relevance
+    """
+    label, pred = np.asarray(label, dtype=float), np.asarray(pred, dtype=float)
+    k = min(k, label.shape[-1])
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    gains = np.broadcast_to(label, pred.shape)
+    dcg = (np.take_along_axis(gains, _top_k(label, pred, k), axis=-1) * discounts).sum(axis=-1)
+    ideal = (np.sort(label, axis=-1)[..., ::-1][..., :k] * discounts).sum(axis=-1)
+    return np.where(ideal > 0, dcg / np.where(ideal > 0, ideal, 1), 0.0)
+
+
 if __name__ == "__main__":
     # Tests
     Y = [1, 1, 0, 0]
@@ -39,3 +74,12 @@ if __name__ == "__main__":
     print(cross_entropy(Y, P))
     print(mean_absolute_error(Y, P))
     print(root_mean_squared_error(Y, P))
+    print(precision_at_k(Y, P, 2))
+    print(ndcg_at_k(Y, P, 2))
+    # batch of configurations
+    PS = [P, [0.9, 0.8, 0.1, 0.0], [0, 1, 1, 0]]
+    print(cross_entropy(Y, PS))
+    print(ndcg_at_k(Y, PS, 2))
+    # constant predictions carry no ranking, they must not score like a perfect one
+    assert ndcg_at_k(Y, [0.5] * 4, 2) < 1
+    assert precision_at_k(Y, [0.5] * 4, 2) < 1
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+class DSWCheckpoint:
+    """Append-only store of raw DSW distances of one run configuration
+
+    Every finished (child, parent, kpi) distance is appended as one json line,
+    so a killed run loses at most the line being written. The file name is a
+    hash of everything the distances depend on (input file content, interval,
+    time index, transformations and mpw), so a checkpoint is never reused for
+    a different configuration. Normalization and metric aggregation are not
+    part of the key, they can be redone from the checkpoint at any time.
+
+    The first line of the file holds the configuration itself, e.g.
+        {"config": {"path": ..., "interval": 1, "mpw": 5, ...}}
+    followed by records like
+        {"c": "svc::cmpt", "p": "svc::cmpt", "kpi": "call_num_sum", "dsw": 1.5}
+    and, once every distance of the run is written, a final record
+        {"complete": true, "candidates": 56, "kpiList": [...]}
+    Without it the checkpoint is from a killed run and misses candidates.
+    """
+
+    def __init__(self, checkpointDir: str, config: Dict):
+        self.config = config
+        self.key = self.configKey(config)
+        self.path = os.path.join(checkpointDir, f"dsw-{self.key}.jsonl")
+        self.distances = {}
+        self.complete = None
+        if not os.path.isdir(checkpointDir):
+            os.makedirs(checkpointDir)
+        if os.path.isfile(self.path):
+            _, self.distances, self.complete = self.read(self.path)
+        self._file = open(self.path, 'a')
+        if self._file.tell() == 0:
+            self._writeLine({"config": config})
+        elif not self._endsWithNewline(self.path):
+            # terminate a partially written line before appending
+            self._file.write("\n")
+
+    @staticmethod
+    def _endsWithNewline(path):
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @staticmethod
+    def fileHash(path: str, blockSize: int = 2**20):
+        """sha1 of the file content"""
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(blockSize), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    @staticmethod
+    def runConfig(path, interval, rowIdx, transformOperations, mpw, source=None):
+        """Everything that the raw DSW distances of a run depend on
+
+        source is the {"path", "fileHash"} of the csv a preprocessed file was
+        made from, so that runs on the csv and on its pickle share checkpoints.
+        """
+        if source is None:
+            source = {"path": os.path.basename(path),
+                      "fileHash": DSWCheckpoint.fileHash(path)}
+        return {
+            "path": source["path"],
+            "fileHash": source["fileHash"],
+            "interval": int(interval),
+            "rowIdx": [str(rowIdx[0]), str(rowIdx[-1]), rowIdx.freqstr, len(rowIdx)],
+            "transformOperations": [list(op) for op in transformOperations],
+            "mpw": mpw,
+        }
+
+    @staticmethod
+    def configKey(config: Dict):
+        content = json.dumps(config, sort_keys=True)
+        return hashlib.sha1(content.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def read(path: str) -> Tuple[Dict, Dict[Tuple[str, str, str], float], Optional[Dict]]:
+        """Load a checkpoint file
+
+        Returns:
+            config: the run configuration in the header
+            distances: dict of (child, parent, kpi) -> raw dsw distance, in
+                the order they were written
+            complete: the completion record, None if the run did not finish
+        """
+        config, distances, complete = {}, {}, None
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # the run was killed while writing this line
+                    continue
+                if "config" in record:
+                    config = record["config"]
+                elif "complete" in record:
+                    complete = record
+                else:
+                    distances[(record["c"], record["p"], record["kpi"])] = record["dsw"]
+        return config, distances, complete
+
+    def _writeLine(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+    def get(self, child: str, parent: str, kpi: str):
+        """Finished distance, or None if it still needs to be computed"""
+        return self.distances.get((child, parent, kpi))
+
+    def add(self, child: str, parent: str, kpi: str, distance: float):
+        self.distances[(child, parent, kpi)] = distance
+        self._writeLine({"c": child, "p": parent, "kpi": kpi, "dsw": distance})
+
+    def markComplete(self, candidates: int, kpiList: List[str]):
+        """Record that the distances of all candidates and kpis are written
+
+        Nothing is written if the checkpoint already holds the same record,
+        so reruns of a finished configuration do not grow the file.
+        """
+        record = {"complete": True, "candidates": candidates, "kpiList": list(kpiList)}
+        if self.complete == record:
+            return
+        self._writeLine(record)
+        self.flush()
+        self.complete = record
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def candidates(distances: Dict[Tuple[str, str, str], float]) -> Tuple[List[Dict], List[str]]:
+        """Rebuild the candidate list with raw distances from checkpoint records
+
+        Returns:
+            candidateList: list of dicts with c, p and dsw-{kpi} entries,
+                in the order the candidates were computed
+            kpiList: kpis in the order they were computed
+        """
+        candidateDict, kpiDict = {}, {}
+        for (child, parent, kpi), distance in distances.items():
+            item = candidateDict.setdefault((child, parent), {"c": child, "p": parent})
+            item[f'dsw-{kpi}'] = distance
+            kpiDict[kpi] = None
+        return list(candidateDict.values()), list(kpiDict)
@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 
 from .time import TimestampAgg
+from .pipeline import PipelinedCSVLoader
 
 
 class TTDataset:
@@ -67,8 +68,31 @@ class HuaweiDataset:
     Huawei Trace Data
     """
 
+    # how the per-minute kpis are merged when rows fall into the same bin,
+    # sums and maxes can also be merged again across partial results
+    _TS_AGG = {
+        'call_num_sum': np.sum,
+        'from_duration_sum': np.sum,
+        'from_duration_max': np.max,
+        'to_duration_sum': np.sum,
+        'to_duration_max': np.max,
+        'from_err_num_sum': np.sum,
+        'from_err_num_max': np.max,
+        'to_err_num_sum': np.sum,
+        'to_err_num_max': np.max
+    }
+    _NAME_COLUMNS = ['parent_csvc_name', 'parent_cmpt_name',
+                     'child_csvc_name', 'child_cmpt_name']
+
+    def __init__(self):
+        # throughput report of the last pipelined load
+        self.pipelineStats = None
+
     def loadRawData(self, filename):
         trace = pd.read_csv(filename)
+        return self.prepareRawData(trace)
+
+    def prepareRawData(self, trace):
         trace['parent_csvc_name'].fillna("Source")
         trace['parent_cmpt_name'].fillna("Source")
         trace['parent_id'] = trace['parent_csvc_name'] + \
@@ -76,14 +100,15 @@ class HuaweiDataset:
         trace['child_id'] = trace['child_csvc_name'] + \
             "::" + trace['child_cmpt_name']
         trace = trace[trace['parent_id'] != trace['child_id']]
-        trace.drop(columns=['parent_csvc_name', 'parent_cmpt_name',
-                            'child_csvc_name', 'child_cmpt_name'],
-                   inplace=True)
+        trace.drop(columns=self._NAME_COLUMNS, inplace=True)
         return trace
 
-    def getCandidateListByDF(self, df):
-        df = df.groupby(['parent_id', 'child_id']).agg(
-            {'call_num_sum': np.sum}).reset_index()
+    def _aggCandidate(self, df):
+        return df.groupby(['parent_id', 'child_id']).agg(
+            {'call_num_sum': np.sum})
+
+    def _candidateListByAgg(self, df):
+        df = df.reset_index()
         candidateList = []
         for i in range(df.shape[0]):
             candidateList.append({
@@ -93,28 +118,23 @@ class HuaweiDataset:
             })
         return candidateList
 
-    def getTSDictByDF(self, df, tsAggFunc, tsAggFreq):
-        # need to process trace
-        cmdbList = list(df['child_id'].unique())
+    def getCandidateListByDF(self, df):
+        return self._candidateListByAgg(self._aggCandidate(df))
 
+    def _aggTS(self, df, tsAggFunc, tsAggFreq):
         df['from_duration_sum'] = df['from_duration_avg'] * df['call_num_sum']
         df['to_duration_sum'] = df['to_duration_avg'] * df['call_num_sum']
         df['from_err_num_sum'] = df['from_err_num_avg'] * df['call_num_sum']
         df['to_err_num_sum'] = df['to_err_num_avg'] * df['call_num_sum']
         # df['timeout_num_sum'] = df['timeout_num_avg'] * df['call_num_sum']
-        df['ts'] = df['ts'].apply(tsAggFunc, args=(
-            tsAggFreq,)).apply(pd.to_datetime)
-        tmpdf = df.groupby(['child_id', 'ts']).agg({
-            'call_num_sum': np.sum,
-            'from_duration_sum': np.sum,
-            'from_duration_max': np.max,
-            'to_duration_sum': np.sum,
-            'to_duration_max': np.max,
-            'from_err_num_sum': np.sum,
-            'from_err_num_max': np.max,
-            'to_err_num_sum': np.sum,
-            'to_err_num_max': np.max
-        })
+        # bins only depend on the timestamp, so convert each distinct one once
+        uniqueTs = pd.Series(df['ts'].unique())
+        binMap = pd.Series(pd.to_datetime(uniqueTs.apply(tsAggFunc, args=(
+            tsAggFreq,))).values, index=uniqueTs.values)
+        df['ts'] = df['ts'].map(binMap)
+        return df.groupby(['child_id', 'ts']).agg(self._TS_AGG)
+
+    def _TSDictByAgg(self, tmpdf):
         tmpdf['from_duration_avg'] = tmpdf['from_duration_sum'] / \
             tmpdf['call_num_sum']
         tmpdf['to_duration_avg'] = tmpdf['to_duration_sum'] / \
@@ -127,8 +147,12 @@ class HuaweiDataset:
                             'to_duration_sum',
                             'from_err_num_sum',
                             'to_err_num_sum'], inplace=True)
+        return tmpdf
 
-        TSDict = tmpdf
+    def getTSDictByDF(self, df, tsAggFunc, tsAggFreq):
+        # need to process trace
+        cmdbList = list(df['child_id'].unique())
+        TSDict = self._TSDictByAgg(self._aggTS(df, tsAggFunc, tsAggFreq))
         return TSDict, cmdbList
 
     def load(self, fileName, tsAggFunc, tsAggFreq):
@@ -137,3 +161,53 @@ class HuaweiDataset:
         TSDict, cmdbList = self.getTSDictByDF(trace, tsAggFunc, tsAggFreq)
         kpiList = list(TSDict.columns)
         return candidateList, TSDict, cmdbList, kpiList
+
+    def loadPipelined(self, fileName, tsAggFunc, tsAggFreq, workers=4,
+                      blockSize=8 * 2**20):
+        """Same as load(), but decompression, parsing and aggregation overlap
+
+        The file is streamed in blocks through PipelinedCSVLoader. Every block
+        is reduced to partial sums / maxes in the worker pool right after
+        parsing, and the aggregation stage merges these small partials at the
+        end, so the full trace is never held in memory.
+        The throughput of each stage is kept in self.pipelineStats.
+        """
+        candidateParts, TSParts = [], []
+        cmdbDict = {}
+
+        def reduce(df):
+            # runs in the worker pool, blocks are independent
+            df = self.prepareRawData(df)
+            return (df['child_id'].unique(),
+                    self._aggCandidate(df),
+                    self._aggTS(df, tsAggFunc, tsAggFreq))
+
+        def aggregate(partial):
+            cmdbIds, candidatePart, TSPart = partial
+            # dict keeps the order of first appearance, as unique() does
+            cmdbDict.update(dict.fromkeys(cmdbIds))
+            candidateParts.append(candidatePart)
+            TSParts.append(TSPart)
+
+        loader = PipelinedCSVLoader(workers=workers, blockSize=blockSize)
+        # fix the dtype of name columns, a block may have them all empty
+        merged = {}
+
+        def merge():
+            candidateAgg = pd.concat(candidateParts).groupby(level=[0, 1]).agg(
+                {'call_num_sum': np.sum})
+            candidateAgg.index.names = ['parent_id', 'child_id']
+            merged['candidateList'] = self._candidateListByAgg(candidateAgg)
+            TSAgg = pd.concat(TSParts).groupby(level=[0, 1]).agg(self._TS_AGG)
+            TSAgg.index.names = ['child_id', 'ts']
+            merged['TSDict'] = self._TSDictByAgg(TSAgg)
+
+        self.pipelineStats = loader.run(
+            fileName, aggregate,
+            parseFunc=reduce,
+            readKwargs={'dtype': dict.fromkeys(self._NAME_COLUMNS, object)},
+            mergeFunc=merge)
+
+        TSDict = merged['TSDict']
+        kpiList = list(TSDict.columns)
+        return merged['candidateList'], TSDict, list(cmdbDict), kpiList
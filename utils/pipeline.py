@@ -0,0 +1,239 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+
+_OPENERS = {
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+}
+
+
+class StageStats:
+    """Work counters of one pipeline stage
+
+    `busy` only accumulates the time spent doing actual work, so the throughput
+    tells how fast the stage is on its own, regardless of waiting on neighbours.
+    For the parsing stage it is summed over all workers, and it includes the
+    per-block `parseFunc` of PipelinedCSVLoader.run(). The aggregation stage
+    includes the final `mergeFunc`.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.busy = 0.0
+        self.bytes = 0
+        self.rows = 0
+        self.blocks = 0
+        self._lock = threading.Lock()
+
+    def add(self, busy: float, nbytes: int = 0, rows: int = 0):
+        with self._lock:
+            self.busy += busy
+            self.bytes += nbytes
+            self.rows += rows
+            self.blocks += 1
+
+    @property
+    def mbps(self):
+        return self.bytes / 2**20 / self.busy if self.busy > 0 else 0.0
+
+    @property
+    def rowsps(self):
+        return self.rows / self.busy if self.busy > 0 else 0.0
+
+    def __str__(self):
+        line = f"{self.name}: {self.blocks} blocks, busy {self.busy:.2f}s"
+        if self.bytes:
+            line += f", {self.bytes / 2**20:.1f} MB at {self.mbps:.1f} MB/s"
+        if self.rows:
+            line += f", {self.rows} rows at {self.rowsps:.0f} rows/s"
+        return line
+
+
+class PipelineStats:
+    def __init__(self, fileName: str, parseName: str = "parse",
+                 aggregateName: str = "aggregate"):
+        self.fileName = fileName
+        self.compressedBytes = os.path.getsize(fileName)
+        self.decompress = StageStats("decompress")
+        self.parse = StageStats(parseName)
+        self.aggregate = StageStats(aggregateName)
+        self.wall = 0.0
+
+    def lines(self):
+        """Human readable report, one line per stage"""
+        wallMbps = self.decompress.bytes / 2**20 / self.wall if self.wall > 0 else 0.0
+        wallRowsps = self.aggregate.rows / self.wall if self.wall > 0 else 0.0
+        return [
+            f"input: {self.compressedBytes / 2**20:.1f} MB on disk, "
+            f"{self.decompress.bytes / 2**20:.1f} MB decompressed",
+            str(self.decompress),
+            str(self.parse),
+            str(self.aggregate),
+            f"wall: {self.wall:.2f}s, {wallMbps:.1f} MB/s, {wallRowsps:.0f} rows/s",
+        ]
+
+
+class PipelinedCSVLoader:
+    """Load a (compressed) csv file with decompression, parsing and aggregation overlapped
+
+    Stage 1 (one thread) decompresses the file and cuts the stream into blocks
+    of whole lines. Stage 2 parses each block into a DataFrame in a thread
+    pool and applies `parseFunc` to it, which is the place for any per-block
+    work such as partial aggregation. Stage 3 (the calling thread) consumes
+    the results in file order with `aggFunc`, and finally runs `mergeFunc`
+    once the whole file is read.
+    The stages are connected by a bounded queue, so memory stays limited to
+    roughly `queueSize` blocks in flight.
+
+    Threads are enough for overlapping here: both lzma decoding and the C csv
+    tokenizer of pandas release the GIL for most of their work.
+
+    Records are assumed not to contain quoted line breaks, which holds for the
+    trace files.
+    """
+
+    def __init__(self,
+                 workers: int = 4,
+                 blockSize: int = 8 * 2**20,
+                 queueSize: int = 8):
+        assert workers > 0, "workers should be positive"
+        self.workers = workers
+        self.blockSize = blockSize
+        self.queueSize = queueSize
+
+    @staticmethod
+    def _open(fileName):
+        ext = os.path.splitext(fileName)[1].lower()
+        return _OPENERS.get(ext, open)(fileName, 'rb')
+
+    def _parseBlock(self, header, block, parseFunc, readKwargs, stats):
+        start = time.perf_counter()
+        df = pd.read_csv(io.BytesIO(header + block), **readKwargs)
+        rows = len(df)
+        if parseFunc is not None:
+            df = parseFunc(df)
+        stats.parse.add(time.perf_counter() - start, len(block), rows)
+        return rows, df
+
+    def _decompress(self, fileName, pool, futures, parseFunc, readKwargs,
+                    stats, stop, errors):
+        def put(item):
+            # do not block forever if the consumer has given up
+            while not stop.is_set():
+                try:
+                    futures.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            with self._open(fileName) as f:
+                start = time.perf_counter()
+                header = f.readline()
+                pending = len(header)
+                rest = b''
+                while not stop.is_set():
+                    chunk = f.read(self.blockSize)
+                    stats.decompress.add(time.perf_counter() - start,
+                                         pending + len(chunk))
+                    pending = 0
+                    if not chunk:
+                        break
+                    data = rest + chunk
+                    cut = data.rfind(b'\n') + 1
+                    block, rest = data[:cut], data[cut:]
+                    if block and not put(pool.submit(self._parseBlock, header, block,
+                                                     parseFunc, readKwargs, stats)):
+                        return
+                    start = time.perf_counter()
+                if rest.strip() and not stop.is_set():
+                    # last line without trailing line break
+                    put(pool.submit(self._parseBlock, header, rest,
+                                    parseFunc, readKwargs, stats))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(None)
+
+    def run(self,
+            fileName: str,
+            aggFunc: Callable[[Any], None],
+            parseFunc: Optional[Callable[[pd.DataFrame], Any]] = None,
+            readKwargs: Optional[Dict] = None,
+            mergeFunc: Optional[Callable[[], None]] = None):
+        """Stream a csv file through the pipeline
+
+        Args:
+            fileName: csv file, compressed with xz, gzip or bz2 according to
+                the extension, or plain csv otherwise
+            aggFunc: called in file order with the result of every block,
+                i.e. the parsed DataFrame or what parseFunc returned
+            parseFunc: optional processing of a parsed block, runs in the
+                worker pool right after parsing
+            readKwargs: extra arguments passed to pd.read_csv
+            mergeFunc: optional final step after all blocks went through
+                aggFunc, e.g. merging partial aggregates; it is counted in
+                the aggregation stage and the wall time
+
+        Returns:
+            stats: PipelineStats of this run
+        """
+        # name the stages after what they time
+        stats = PipelineStats(fileName,
+                              "parse" if parseFunc is None else "parse+reduce",
+                              "aggregate" if mergeFunc is None else "aggregate+merge")
+        readKwargs = readKwargs or {}
+        futures = queue.Queue(maxsize=self.queueSize)
+        stop = threading.Event()
+        errors = []
+
+        wallStart = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            decompressor = threading.Thread(
+                target=self._decompress,
+                args=(fileName, pool, futures, parseFunc, readKwargs,
+                      stats, stop, errors),
+                name="aid-decompress", daemon=True)
+            decompressor.start()
+            try:
+                while True:
+                    future = futures.get()
+                    if future is None:
+                        break
+                    rows, result = future.result()
+                    start = time.perf_counter()
+                    aggFunc(result)
+                    stats.aggregate.add(time.perf_counter() - start, 0, rows)
+            finally:
+                stop.set()
+                # drain so that the decompressor is never stuck on a full queue
+                while decompressor.is_alive():
+                    try:
+                        futures.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                decompressor.join()
+        if errors:
+            raise errors[0]
+
+        if mergeFunc is not None:
+            start = time.perf_counter()
+            mergeFunc()
+            # the merge sees every row once more, but is not a block
+            stats.aggregate.busy += time.perf_counter() - start
+        stats.wall = time.perf_counter() - wallStart
+        return stats